@@ -12,21 +12,33 @@ Usage:
   python birthday_runner.py                        # run for today
   python birthday_runner.py --test-date 09-06      # run for a specific MM-DD (testing)
   python birthday_runner.py --next-days 30         # run for all birthdays in next N days
+  python birthday_runner.py --migrate              # one-time: add lookup indexes to the CRM DB
 """
 
+import argparse
+import atexit
+import functools
+import hashlib
 import json
-import os
+import logging
+import logging.handlers
+import queue
 import re
 import sqlite3
 import sys
 import time
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime
 from pathlib import Path
+from typing import NamedTuple
 from zoneinfo import ZoneInfo
 
-import requests
 import yaml
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from common import RateLimiter, get_anthropic_key, get_telegram_token, json_loads, make_session
 
 # ── Config ────────────────────────────────────────────────────────────────────
 
@@ -34,9 +46,74 @@ SCRIPT_DIR   = Path(__file__).parent
 CONFIG_FILE  = SCRIPT_DIR / "configs" / "birthdays.yaml"
 TZ           = ZoneInfo("America/Los_Angeles")
 CRM_DB       = Path("/Users/antonio/dev/Agents/projects/crm/data/crm.db")
+AI_WORKERS   = 8                # concurrent Claude requests per run
+CACHE_DB     = SCRIPT_DIR / ".cache" / "birthday_messages.db"
+CACHE_TTL    = 30 * 24 * 3600   # seconds a generated message stays reusable
+ANTHROPIC_URL = "https://api.anthropic.com/v1/messages"
+BATCH_MIN     = 3               # fewer uncached contacts than this go out as single requests
+BATCH_POLL    = 10              # seconds between Message Batch status checks
+BATCH_TIMEOUT = 15 * 60         # cancel a batch still running after this long
+BATCH_CANCEL_WAIT = 5 * 60      # how long a cancelled batch may take to reach "ended"
+
+# ── HTTP session ──────────────────────────────────────────────────────────────
+
+# One pooled keep-alive session for every Anthropic/Telegram call.
+SESSION = make_session()
+
+# Anthropic calls also retry on overload/server statuses, POST included: a
+# repeated generation only costs tokens, and the already-built request body is
+# resent as-is. Retry-After is honoured on 429/503.
+SESSION.mount("https://api.anthropic.com", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=AI_WORKERS,
+    max_retries=Retry(
+        total=4,
+        backoff_factor=1.0,
+        status_forcelist=(429, 500, 502, 503, 504, 529),
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False,
+    ),
+))
+
+# ...except Message Batch endpoints. A retried create POST would submit a second
+# paid batch, so these keep status retries to idempotent methods (polling and
+# results). requests picks the longest matching prefix, so this mount wins.
+SESSION.mount(f"{ANTHROPIC_URL}/batches", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=2,
+    max_retries=Retry(
+        total=4,
+        backoff_factor=1.0,
+        status_forcelist=(429, 500, 502, 503, 504, 529),
+        raise_on_status=False,
+    ),
+))
+
+# ── Logging ───────────────────────────────────────────────────────────────────
+
+log = logging.getLogger("birthday_runner")
+
+
+def setup_logging() -> None:
+    """Send status lines to stdout from a background thread.
+
+    Records go onto an in-memory queue, so a slow cron log file never stalls
+    the send loop. The listener is flushed and stopped at interpreter exit.
+    """
+    q: queue.Queue = queue.Queue(-1)
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(q, handler)
+    log.addHandler(logging.handlers.QueueHandler(q))
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    listener.start()
+    atexit.register(listener.stop)
+
 
 # ── Load config ───────────────────────────────────────────────────────────────
 
+@functools.lru_cache(maxsize=None)
 def load_config() -> dict:
     if not CONFIG_FILE.exists():
         sys.exit(f"❌ Config not found: {CONFIG_FILE}")
@@ -44,84 +121,126 @@ def load_config() -> dict:
         return yaml.safe_load(f)
 
 
-# ── Credentials ───────────────────────────────────────────────────────────────
-
-def get_anthropic_key() -> str:
-    auth_path = Path.home() / ".openclaw" / "agents" / "main" / "agent" / "auth.json"
-    if auth_path.exists():
-        try:
-            key = json.loads(auth_path.read_text()).get("anthropic", {}).get("key")
-            if key:
-                return key
-        except Exception:
-            pass
-    key = os.environ.get("ANTHROPIC_API_KEY", "")
-    if not key:
-        sys.exit("❌ No Anthropic API key found")
-    return key
-
-
-def get_telegram_token() -> str:
-    config_path = Path.home() / ".openclaw" / "openclaw.json"
-    if config_path.exists():
-        try:
-            cfg = json.loads(config_path.read_text())
-            token = cfg.get("channels", {}).get("telegram", {}).get("botToken", "")
-            if token:
-                return token
-        except Exception:
-            pass
-    sys.exit("❌ No Telegram bot token found")
-
-
 # ── CRM queries ───────────────────────────────────────────────────────────────
 
-def get_birthday_contacts(db_path: Path, mmdd: str, min_score: int) -> list[dict]:
-    """Return contacts with birthday on mmdd (MM-DD) and score > min_score."""
+# Indexes the birthday lookup relies on. The expression index must match the
+# dedup subquery in get_birthday_contacts exactly for SQLite to use it.
+# Created once via --migrate (ensure_crm_indexes), never on the read path.
+CRM_INDEXES = (
+    """CREATE INDEX IF NOT EXISTS idx_contacts_bday_mmdd
+       ON contacts(substr(birthday, 6, 5))
+       WHERE birthday IS NOT NULL AND birthday != ''""",
+    """CREATE INDEX IF NOT EXISTS idx_interactions_contact_date
+       ON interactions(contact_id, date DESC)""",
+)
+
+
+def _connect_crm(db_path: Path) -> sqlite3.Connection:
+    """Open the CRM DB with transactions managed explicitly and per-connection read pragmas.
+
+    Only connection-scoped pragmas are set here; the CRM's journal mode belongs to
+    the project that owns the database and is left untouched.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
+
+def ensure_crm_indexes(db_path: Path):
+    """One-time migration: create the lookup indexes in CRM_INDEXES."""
     conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    try:
+        with conn:
+            for ddl in CRM_INDEXES:
+                conn.execute(ddl)
+    finally:
+        conn.close()
+
+
+class Contact(NamedTuple):
+    """One CRM contact, in the column order get_birthday_contacts selects."""
+    id: int | None = None
+    name: str | None = None
+    email: str | None = None
+    phone: str | None = None
+    company: str | None = None
+    role: str | None = None
+    score: int | None = None
+    birthday: str | None = None
+    last_touch: str | None = None
+    last_topic: str | None = None
+    preferred_name: str | None = None
+    relationship_type: str | None = None
+    how_we_met: str | None = None
+    interaction_count_30d: int | None = None
+    interaction_count_90d: int | None = None
+    last_interaction: dict | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Contact":
+        """Rebuild a contact from its --data-only JSON form; unknown keys are ignored."""
+        return cls(*(data.get(f) for f in cls._fields))
+
+
+def get_birthday_contacts(db_path: Path, mmdd: str, min_score: int) -> list[Contact]:
+    """Return contacts with birthday on mmdd (MM-DD) and score > min_score."""
+    conn = _connect_crm(db_path)
     cur = conn.cursor()
+    cur.execute("BEGIN")   # one read snapshot for the whole lookup
 
+    # Last interaction is joined in the same statement (one row per contact via
+    # a correlated rowid lookup) instead of one follow-up query per contact.
     cur.execute("""
         SELECT
             c.id, c.name, c.email, c.phone, c.company, c.role,
             c.score, c.birthday, c.last_touch, c.last_topic,
             c.preferred_name, c.relationship_type, c.how_we_met,
-            c.interaction_count_30d, c.interaction_count_90d
+            c.interaction_count_30d, c.interaction_count_90d,
+            i.date AS li_date, i.subject AS li_subject,
+            i.snippet AS li_snippet, i.source AS li_source
         FROM contacts c
-        WHERE c.birthday IS NOT NULL
-          AND c.birthday != ''
-          AND substr(c.birthday, 6, 5) = ?
-          AND c.score > ?
-        GROUP BY c.name, substr(c.birthday, 6, 5)   -- deduplicate same person across multiple email entries
+        LEFT JOIN interactions i ON i.rowid = (
+            SELECT rowid FROM interactions
+            WHERE contact_id = c.id
+            ORDER BY date DESC LIMIT 1
+        )
+        WHERE c.id IN (
+            -- deduplicate same person across multiple email entries before
+            -- fetching full rows; served by idx_contacts_bday_mmdd
+            SELECT MIN(id) FROM contacts
+            WHERE birthday IS NOT NULL
+              AND birthday != ''
+              AND substr(birthday, 6, 5) = ?
+              AND score > ?
+            GROUP BY name
+        )
         ORDER BY c.score DESC
     """, (mmdd, min_score))
 
+    n = len(Contact._fields) - 1   # contact columns; the rest are the joined interaction
     contacts = []
     for row in cur.fetchall():
-        c = dict(row)
-        # Get last interaction snippet
-        cur2 = conn.cursor()
-        cur2.execute("""
-            SELECT date, subject, snippet, source FROM interactions
-            WHERE contact_id = ?
-            ORDER BY date DESC LIMIT 1
-        """, (c["id"],))
-        last = cur2.fetchone()
-        c["last_interaction"] = dict(last) if last else None
-        contacts.append(c)
+        last = dict(zip(("date", "subject", "snippet", "source"), row[n:]))
+        last_int = last if any(v is not None for v in last.values()) else None
+        contacts.append(Contact._make(row[:n] + (last_int,)))
 
+    cur.execute("COMMIT")
     conn.close()
     return contacts
 
 
 # ── Phone normalisation ───────────────────────────────────────────────────────
 
+PHONE_RE = re.compile(r"[^\d+]")
+
+
 def normalize_phone(phone: str | None) -> str | None:
     """Strip formatting, return digits only with + prefix if international."""
     if not phone:
         return None
-    digits = re.sub(r"[^\d+]", "", phone)
+    digits = PHONE_RE.sub("", phone)
     # Remove leading + for length check
     bare = digits.lstrip("+")
     if len(bare) == 10:
@@ -136,25 +255,70 @@ def tel_url(phone: str) -> str:
     return f"tel:{phone}"
 
 
+# ── AI response cache ─────────────────────────────────────────────────────────
+
+def _cache_conn() -> sqlite3.Connection:
+    CACHE_DB.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(CACHE_DB)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, response TEXT, created REAL)"
+    )
+    return conn
+
+
+def cache_key(prompt: str, model: str) -> str:
+    return hashlib.sha256(f"{model}\n{prompt}".encode()).hexdigest()
+
+
+def cache_get(key: str) -> str | None:
+    """Return a cached response younger than CACHE_TTL, or None."""
+    try:
+        conn = _cache_conn()
+        try:
+            row = conn.execute(
+                "SELECT response FROM cache WHERE key = ? AND created > ?",
+                (key, time.time() - CACHE_TTL),
+            ).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+def cache_put(key: str, response: str) -> None:
+    try:
+        conn = _cache_conn()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, response, created) VALUES (?, ?, ?)",
+                    (key, response, time.time()),
+                )
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass   # cache is best-effort; a failed write just means a fresh call next run
+
+
+def cached_response(func):
+    """Memoize func(prompt, api_key, model) on disk, keyed by sha256 of model + prompt."""
+    @functools.wraps(func)
+    def wrapper(prompt: str, api_key: str, model: str) -> str:
+        key = cache_key(prompt, model)
+        hit = cache_get(key)
+        if hit is not None:
+            return hit
+        response = func(prompt, api_key, model)
+        cache_put(key, response)
+        return response
+    return wrapper
+
+
 # ── AI message generation ─────────────────────────────────────────────────────
 
-def generate_birthday_message(contact: dict, api_key: str, model: str) -> str:
-    """Generate a short, humanized birthday message for the contact."""
-    name        = contact.get("preferred_name") or contact.get("name", "").split()[0]
-    company     = contact.get("company") or ""
-    role        = contact.get("role") or ""
-    rel_type    = contact.get("relationship_type") or ""
-    how_met     = contact.get("how_we_met") or ""
-    last_touch  = contact.get("last_touch") or "unknown"
-    last_topic  = contact.get("last_topic") or ""
-    score       = contact.get("score", 50)
-    last_int    = contact.get("last_interaction")
-
-    last_int_str = ""
-    if last_int:
-        last_int_str = f"Last interaction ({last_int['date']}): {last_int.get('subject','')}"
-
-    prompt = f"""Write a short, warm birthday message that Antonio Silveira (CTO at Attentive) could send to {name}.
+# Filled with str.format_map in build_contact_prompt.
+PROMPT_TEMPLATE = """Write a short, warm birthday message that Antonio Silveira (CTO at Attentive) could send to {name}.
 
 Contact context:
 - Name: {name}
@@ -163,7 +327,7 @@ Contact context:
 - How they met: {how_met}
 - CRM score: {score}/100
 - Last contact: {last_touch}
-- {last_int_str}
+- {last_interaction}
 
 Rules:
 - 1-3 sentences max — keep it short and genuine
@@ -176,43 +340,178 @@ Rules:
 - Sound like Antonio — warm but concise, CTO energy
 - Return ONLY the message text, nothing else"""
 
-    resp = requests.post(
-        "https://api.anthropic.com/v1/messages",
-        headers={
-            "x-api-key": api_key,
-            "anthropic-version": "2023-06-01",
-            "content-type": "application/json",
-        },
-        json={
-            "model": model,
-            "max_tokens": 256,
-            "messages": [{"role": "user", "content": prompt}],
-        },
+
+def _anthropic_headers(api_key: str) -> dict:
+    return {
+        "x-api-key": api_key,
+        "anthropic-version": "2023-06-01",
+        "content-type": "application/json",
+    }
+
+
+def _message_params(prompt: str, model: str) -> dict:
+    """Messages API body for one contact prompt (shared by single and batch requests)."""
+    return {
+        "model": model,
+        "max_tokens": 256,
+        "messages": [{"role": "user", "content": prompt}],
+    }
+
+
+@cached_response
+def call_claude(prompt: str, api_key: str, model: str) -> str:
+    """Send a single-turn prompt to Claude. Returns the response text."""
+    resp = SESSION.post(
+        ANTHROPIC_URL,
+        headers=_anthropic_headers(api_key),
+        json=_message_params(prompt, model),
         timeout=30,
     )
     resp.raise_for_status()
     return resp.json()["content"][0]["text"].strip()
 
 
+def run_message_batch(prompts: dict[str, str], api_key: str, model: str) -> dict[str, str]:
+    """Submit {custom_id: prompt} as one Message Batch and wait for it to end.
+
+    Returns {custom_id: text} for the requests that succeeded. A batch still
+    running after BATCH_TIMEOUT is cancelled and polled until it ends, so the
+    requests it already finished (and billed) are still returned. Raises on HTTP
+    errors, and TimeoutError if a cancelled batch outlives BATCH_CANCEL_WAIT.
+    """
+    headers = _anthropic_headers(api_key)
+    resp = SESSION.post(
+        f"{ANTHROPIC_URL}/batches",
+        headers=headers,
+        json={"requests": [
+            {"custom_id": custom_id, "params": _message_params(prompt, model)}
+            for custom_id, prompt in prompts.items()
+        ]},
+        timeout=30,
+    )
+    resp.raise_for_status()
+    batch = resp.json()
+
+    deadline  = time.monotonic() + BATCH_TIMEOUT
+    cancelled = False
+    while batch["processing_status"] != "ended":
+        if time.monotonic() > deadline:
+            if cancelled:
+                raise TimeoutError(f"batch {batch['id']} still {batch['processing_status']} after cancel")
+            log.warning(f"  ⚠️  Batch {batch['id']} timed out, cancelling and keeping finished results")
+            resp = SESSION.post(f"{ANTHROPIC_URL}/batches/{batch['id']}/cancel",
+                                headers=headers, timeout=15)
+            resp.raise_for_status()
+            cancelled = True
+            deadline  = time.monotonic() + BATCH_CANCEL_WAIT
+        time.sleep(BATCH_POLL)
+        resp = SESSION.get(f"{ANTHROPIC_URL}/batches/{batch['id']}", headers=headers, timeout=15)
+        resp.raise_for_status()
+        batch = resp.json()
+
+    resp = SESSION.get(batch["results_url"], headers=headers, timeout=30)
+    resp.raise_for_status()
+    texts = {}
+    for line in resp.text.splitlines():
+        if not line.strip():
+            continue
+        entry  = json_loads(line)
+        result = entry.get("result", {})
+        if result.get("type") == "succeeded":
+            texts[entry["custom_id"]] = result["message"]["content"][0]["text"].strip()
+    return texts
+
+
+def build_contact_prompt(contact: Contact) -> str:
+    """Fill PROMPT_TEMPLATE for one contact."""
+    last_int = contact.last_interaction
+    fields = {
+        "name":       contact.preferred_name or (contact.name or "").split()[0],
+        "company":    contact.company or "",
+        "role":       contact.role or "",
+        "rel_type":   contact.relationship_type or "",
+        "how_met":    contact.how_we_met or "",
+        "last_touch": contact.last_touch or "unknown",
+        "score":      contact.score,
+        "last_interaction": (
+            f"Last interaction ({last_int['date']}): {last_int.get('subject','')}"
+            if last_int else ""
+        ),
+    }
+    return PROMPT_TEMPLATE.format_map(fields)
+
+
+def generate_birthday_message(contact: Contact, api_key: str, model: str) -> str:
+    """Generate a short, humanized birthday message for the contact."""
+    return call_claude(build_contact_prompt(contact), api_key, model)
+
+
+def generate_birthday_messages(contacts: list[Contact], api_key: str, model: str) -> dict[int, str]:
+    """Generate messages for all contacts. Returns {index: message} for those that succeeded.
+
+    Cached prompts are served from disk. If at least BATCH_MIN remain, they go
+    out as one Message Batch (billed at half price); smaller sets, and anything
+    the batch did not return, fall back to concurrent single requests.
+    """
+    prompts  = {i: build_contact_prompt(c) for i, c in enumerate(contacts)}
+    messages: dict[int, str] = {}
+    for i, prompt in prompts.items():
+        hit = cache_get(cache_key(prompt, model))
+        if hit is not None:
+            messages[i] = hit
+    pending = [i for i in prompts if i not in messages]
+
+    if len(pending) >= BATCH_MIN:
+        try:
+            results = run_message_batch({f"contact-{i}": prompts[i] for i in pending}, api_key, model)
+        except Exception as e:
+            log.warning(f"  ⚠️  Batch failed, falling back to single requests: {e}")
+            results = {}
+        for i in pending:
+            text = results.get(f"contact-{i}")
+            if text:
+                messages[i] = text
+                cache_put(cache_key(prompts[i], model), text)
+        pending = [i for i in pending if i not in messages]
+
+    # Claude calls are network-bound, so overlap them; Telegram sends stay serial.
+    with ThreadPoolExecutor(max_workers=AI_WORKERS) as pool:
+        futures = {pool.submit(call_claude, prompts[i], api_key, model): i for i in pending}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                messages[i] = future.result()
+            except Exception as e:
+                name = contacts[i].name or "Unknown"
+                log.warning(f"  ⚠️  AI failed for {name}: {e}")
+    return messages
+
+
 # ── Telegram delivery ─────────────────────────────────────────────────────────
 
+TELEGRAM_LIMITER = RateLimiter(1.2)
+
+
+_HTML_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+
 def html_escape(text: str) -> str:
-    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return text.translate(_HTML_TABLE)
 
 
-def send_birthday_message(contact: dict, message: str, chat_id: str,
+def send_birthday_message(contact: Contact, message: str, chat_id: str,
                           thread_id: int, bot_token: str) -> bool:
     """Send one birthday card message with inline buttons."""
-    name       = contact.get("name", "Unknown")
-    company    = contact.get("company") or ""
-    role       = contact.get("role") or ""
-    score      = contact.get("score", 0)
-    last_touch = contact.get("last_touch") or "never"
-    phone_raw  = contact.get("phone")
+    name       = contact.name or "Unknown"
+    company    = contact.company or ""
+    role       = contact.role or ""
+    score      = contact.score or 0
+    last_touch = contact.last_touch or "never"
+    phone_raw  = contact.phone
     phone      = normalize_phone(phone_raw)
 
     # Build birthday date label
-    bday = contact.get("birthday", "")
+    bday = contact.birthday or ""
     bday_label = ""
     age_str = ""
     if bday:
@@ -253,7 +552,7 @@ def send_birthday_message(contact: dict, message: str, chat_id: str,
         {"text": "📋 Copy message", "copy_text": {"text": message}},
     ]
 
-    resp = requests.post(
+    resp = SESSION.post(
         f"https://api.telegram.org/bot{bot_token}/sendMessage",
         json={
             "chat_id": chat_id,
@@ -266,11 +565,42 @@ def send_birthday_message(contact: dict, message: str, chat_id: str,
         timeout=15,
     )
     if not resp.ok:
-        print(f"  ⚠️  Telegram error: {resp.text}")
+        log.warning(f"  ⚠️  Telegram error: {resp.text}")
         return False
     return True
 
 
+def fallback_message(contact: Contact) -> str:
+    first = contact.preferred_name or (contact.name or "").split()[0]
+    return f"🎉 Happy Birthday {first}! Hope you have a great day 🎂"
+
+
+def send_all(contacts: list[Contact], messages: list[str | None], chat_id: str,
+             thread_id: int, bot_token: str) -> int:
+    """Send one card per contact to the topic. Returns sent count.
+
+    Sends stay serial and spaced out: every card lands in the same group topic,
+    and Telegram throttles a single group far below the bot-wide 30 msg/s.
+    """
+    sent = 0
+    for i, (contact, message) in enumerate(zip(contacts, messages), 1):
+        name = contact.name or "Unknown"
+        log.info(f"  [{i}/{len(contacts)}] {name} (score: {contact.score})")
+        if message:
+            log.info(f"    → {message[:80]}...")
+        else:
+            message = fallback_message(contact)
+
+        TELEGRAM_LIMITER.acquire()
+        ok = send_birthday_message(contact, message, chat_id, thread_id, bot_token)
+        if ok:
+            sent += 1
+            log.info("    ✅ Sent")
+        else:
+            log.warning("    ❌ Failed")
+    return sent
+
+
 # ── Main ──────────────────────────────────────────────────────────────────────
 
 def get_date_range(start: date, days: int) -> list[str]:
@@ -279,68 +609,76 @@ def get_date_range(start: date, days: int) -> list[str]:
     return [(start + timedelta(days=i)).strftime("%m-%d") for i in range(days)]
 
 
-def run_for_date(mmdd: str, label: str, config: dict, api_key: str,
-                 bot_token: str) -> tuple[int, int]:
-    """Process one date. Returns (sent, total)."""
+def run_for_dates(dates: list[tuple[str, str]], config: dict, api_key: str,
+                  bot_token: str) -> tuple[int, int]:
+    """Process (mmdd, label) dates. Returns (sent, total).
+
+    Contacts for every date are generated together, so a --next-days run makes
+    at most one Message Batch; sending then goes date by date.
+    """
     chat_id   = config["destination"]["chat_id"]
     thread_id = config["destination"]["thread_id"]
     min_score = config.get("min_score", 30)
     model     = config.get("model", "claude-haiku-4-5-20251001")
 
-    contacts = get_birthday_contacts(CRM_DB, mmdd, min_score)
+    per_date = [(mmdd, label, get_birthday_contacts(CRM_DB, mmdd, min_score))
+                for mmdd, label in dates]
+    contacts = [c for _, _, day in per_date for c in day]
     if not contacts:
         return 0, 0
 
-    print(f"\n📅 {label} ({mmdd}) — {len(contacts)} contact(s)")
-    sent = 0
-    for i, contact in enumerate(contacts, 1):
-        name = contact.get("name", "Unknown")
-        print(f"  [{i}/{len(contacts)}] {name} (score: {contact.get('score')})")
-        try:
-            message = generate_birthday_message(contact, api_key, model)
-            print(f"    → {message[:80]}...")
-        except Exception as e:
-            print(f"    ⚠️  AI failed: {e}")
-            first = contact.get("preferred_name") or name.split()[0]
-            message = f"🎉 Happy Birthday {first}! Hope you have a great day 🎂"
+    messages = generate_birthday_messages(contacts, api_key, model)
+    sent = offset = 0
+    for mmdd, label, day in per_date:
+        if not day:
+            continue
+        log.info(f"\n📅 {label} ({mmdd}) — {len(day)} contact(s)")
+        sent += send_all(day, [messages.get(offset + i) for i in range(len(day))],
+                         chat_id, thread_id, bot_token)
+        offset += len(day)
+    return sent, len(contacts)
 
-        time.sleep(0.5)
-        ok = send_birthday_message(contact, message, chat_id, thread_id, bot_token)
-        if ok:
-            sent += 1
-            print(f"    ✅ Sent")
-        else:
-            print(f"    ❌ Failed")
-        time.sleep(1.2)
 
-    return sent, len(contacts)
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--test-date", metavar="MM-DD",
+                        help="run for a specific MM-DD instead of today")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--next-days", type=int, metavar="N",
+                      help="run for all birthdays in the next N days")
+    mode.add_argument("--data-only", action="store_true",
+                      help="print matching contacts as JSON (no LLM, no Telegram)")
+    mode.add_argument("--send-json", type=Path, metavar="FILE",
+                      help="send pre-generated messages from FILE (no LLM)")
+    mode.add_argument("--migrate", action="store_true",
+                      help="create the CRM lookup indexes once and exit")
+    return parser.parse_args()
 
 
 def main():
+    args = parse_args()
+    setup_logging()
     today   = date.today()
     now_str = datetime.now(tz=TZ).strftime("%Y-%m-%d %H:%M %Z")
 
-    # Parse flags
-    test_date = None
-    next_days = None
+    test_date = args.test_date
+    next_days = args.next_days
 
-    if "--test-date" in sys.argv:
-        idx = sys.argv.index("--test-date")
-        if idx + 1 < len(sys.argv):
-            test_date = sys.argv[idx + 1]
-
-    if "--next-days" in sys.argv:
-        idx = sys.argv.index("--next-days")
-        if idx + 1 < len(sys.argv):
-            next_days = int(sys.argv[idx + 1])
+    # ── Mode: one-time CRM migration ─────────────────────────────────────────
+    if args.migrate:
+        ensure_crm_indexes(CRM_DB)
+        log.info(f"✅ CRM lookup indexes ensured in {CRM_DB}")
+        return
 
     # ── Mode: data only (no LLM, no Telegram — outputs contacts JSON) ────────
-    if "--data-only" in sys.argv:
+    if args.data_only:
         mmdd   = test_date or today.strftime("%m-%d")
         config = load_config()
         contacts = get_birthday_contacts(CRM_DB, mmdd, config.get("min_score", 30))
         print(json.dumps({
-            "contacts": [dict(c) for c in contacts],
+            "contacts": [c._asdict() for c in contacts],
             "config": {
                 "destination": config["destination"],
                 "model": config.get("model", "claude-haiku-4-5-20251001"),
@@ -351,27 +689,17 @@ def main():
         return
 
     # ── Mode: send pre-generated messages (no LLM) ───────────────────────────
-    if "--send-json" in sys.argv:
-        idx_arg   = sys.argv.index("--send-json")
-        file_path = Path(sys.argv[idx_arg + 1])
-        payload   = json.loads(file_path.read_text())
+    if args.send_json:
+        payload   = json_loads(args.send_json.read_bytes())
         bot_token = get_telegram_token()
-        contacts  = payload["contacts"]
+        contacts  = [Contact.from_dict(c) for c in payload["contacts"]]
         messages  = payload.get("messages", {})   # {"0": "msg", "1": "msg"}
         cfg       = payload["config"]
         chat_id   = cfg["destination"]["chat_id"]
         thread_id = cfg["destination"]["thread_id"]
-        sent = 0
-        for i, contact in enumerate(contacts):
-            msg = (messages.get(str(i)) or "").strip()
-            if not msg:
-                first = contact.get("preferred_name") or contact.get("name", "").split()[0]
-                msg = f"🎉 Happy Birthday {first}! Hope you have a great day 🎂"
-            ok = send_birthday_message(contact, msg, chat_id, thread_id, bot_token)
-            if ok:
-                sent += 1
-            time.sleep(1.2)
-        print(f"✅ Sent {sent}/{len(contacts)} birthday messages")
+        sent = send_all(contacts, [(messages.get(str(i)) or "").strip() for i in range(len(contacts))],
+                        chat_id, thread_id, bot_token)
+        log.info(f"✅ Sent {sent}/{len(contacts)} birthday messages")
         return
 
     config    = load_config()
@@ -380,37 +708,35 @@ def main():
 
     # ── Mode: next N days ─────────────────────────────────────────────────────
     if next_days:
-        print(f"🎂 Birthday Runner — {now_str}")
-        print(f"   Scanning next {next_days} days for birthdays...\n")
+        log.info(f"🎂 Birthday Runner — {now_str}")
+        log.info(f"   Scanning next {next_days} days for birthdays...\n")
 
         from datetime import timedelta
-        total_sent = total_found = 0
+        dates = []
         for i in range(next_days):
             d     = today + timedelta(days=i)
-            mmdd  = d.strftime("%m-%d")
             label = d.strftime("%B %d") + (" (today)" if i == 0 else f" (+{i}d)")
-            sent, found = run_for_date(mmdd, label, config, api_key, bot_token)
-            total_sent  += sent
-            total_found += found
+            dates.append((d.strftime("%m-%d"), label))
+        total_sent, total_found = run_for_dates(dates, config, api_key, bot_token)
 
-        print(f"\n{'='*50}")
-        print(f"🎂 Done — {total_sent}/{total_found} messages sent across next {next_days} days")
+        log.info(f"\n{'='*50}")
+        log.info(f"🎂 Done — {total_sent}/{total_found} messages sent across next {next_days} days")
         return
 
     # ── Mode: single date (today or --test-date) ──────────────────────────────
     mmdd    = test_date or today.strftime("%m-%d")
     label   = "TEST DATE" if test_date else "today"
-    print(f"🎂 Birthday Runner — {now_str}")
-    print(f"   Checking birthdays for: {mmdd}  [{label}]\n")
+    log.info(f"🎂 Birthday Runner — {now_str}")
+    log.info(f"   Checking birthdays for: {mmdd}  [{label}]\n")
 
-    sent, found = run_for_date(mmdd, label, config, api_key, bot_token)
+    sent, found = run_for_dates([(mmdd, label)], config, api_key, bot_token)
 
     if not found:
-        print("✅ No birthdays today above score threshold — nothing to send.")
+        log.info("✅ No birthdays today above score threshold — nothing to send.")
         return
 
-    print(f"\n{'='*50}")
-    print(f"🎂 Sent {sent}/{found} birthday messages to topic {config['destination']['thread_id']}")
+    log.info(f"\n{'='*50}")
+    log.info(f"🎂 Sent {sent}/{found} birthday messages to topic {config['destination']['thread_id']}")
 
 
 if __name__ == "__main__":
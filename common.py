@@ -0,0 +1,110 @@
+"""
+Shared helpers for engine.py and birthday_runner.py.
+
+HTTP session setup, OpenClaw credential lookup and request pacing, kept in one
+place so the two runners cannot drift apart.
+"""
+
+import functools
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from orjson import loads as json_loads
+except ImportError:   # orjson is optional; stdlib json parses the same files
+    from json import loads as json_loads
+
+# ── HTTP session ──────────────────────────────────────────────────────────────
+
+def make_session() -> requests.Session:
+    """One pooled keep-alive session for every outbound call of a run.
+
+    Retries cover connection errors for all methods, but status retries only
+    apply to idempotent methods so a 502 on sendMessage never double-posts a
+    message. Callers may mount host-specific adapters on top.
+    """
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=20,
+        pool_maxsize=20,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 502, 503, 504),
+            raise_on_status=False,
+        ),
+    ))
+    return session
+
+
+# ── Credentials ───────────────────────────────────────────────────────────────
+
+@functools.lru_cache(maxsize=None)
+def load_json(path: str) -> dict:
+    """Parse a JSON file once per process; {} if it is missing, malformed or not an object."""
+    try:
+        data = json_loads(Path(path).read_bytes())
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def get_str(data: dict, *keys: str) -> str:
+    """Walk nested dicts by keys; '' unless the value found is a string."""
+    for key in keys:
+        if not isinstance(data, dict):
+            return ""
+        data = data.get(key)
+    return data if isinstance(data, str) else ""
+
+
+def load_openclaw() -> dict:
+    return load_json(str(Path.home() / ".openclaw" / "openclaw.json"))
+
+
+def get_anthropic_key() -> str:
+    auth_path = Path.home() / ".openclaw" / "agents" / "main" / "agent" / "auth.json"
+    key = get_str(load_json(str(auth_path)), "anthropic", "key")
+    if key:
+        return key
+    key = os.environ.get("ANTHROPIC_API_KEY", "")
+    if not key:
+        sys.exit("❌ No Anthropic API key found")
+    return key
+
+
+def get_telegram_token() -> str:
+    token = get_str(load_openclaw(), "channels", "telegram", "botToken")
+    if token:
+        return token
+    sys.exit("❌ No Telegram bot token found")
+
+
+# ── Pacing ────────────────────────────────────────────────────────────────────
+
+class RateLimiter:
+    """Thread-safe pacer: acquire() blocks until `interval` seconds after the previous slot.
+
+    Time already spent waiting on the network counts toward the interval, so
+    callers only sleep when they are actually ahead of the budget.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_ok = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._next_ok - now)
+            self._next_ok = max(now, self._next_ok) + self.interval
+        if wait:
+            time.sleep(wait)
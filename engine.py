@@ -14,26 +14,38 @@ Examples:
   python engine.py stone-news flash
 """
 
+import argparse
+import functools
 import json
 import os
 import re
 import subprocess
 import sys
-import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
-import requests
 import yaml
 
+from common import (
+    RateLimiter, get_anthropic_key, get_str, get_telegram_token, load_openclaw, make_session,
+)
+
 # ── Paths ─────────────────────────────────────────────────────────────────────
 
 SCRIPT_DIR = Path(__file__).parent
 TZ = ZoneInfo("America/Los_Angeles")
 
+# ── HTTP session ──────────────────────────────────────────────────────────────
+
+# One pooled keep-alive session for every Anthropic/Brave/Telegram call.
+SESSION = make_session()
+
 # ── Config loaders ────────────────────────────────────────────────────────────
 
+@functools.lru_cache(maxsize=None)
 def load_module_config(module_name: str) -> dict:
     config_path = SCRIPT_DIR / "configs" / f"{module_name}.yaml"
     if not config_path.exists():
@@ -49,56 +61,22 @@ def load_prompt(prompt_path: str) -> str:
     return full_path.read_text()
 
 
-def get_anthropic_key() -> str:
-    auth_path = Path.home() / ".openclaw" / "agents" / "main" / "agent" / "auth.json"
-    if auth_path.exists():
-        try:
-            key = json.loads(auth_path.read_text()).get("anthropic", {}).get("key")
-            if key:
-                return key
-        except Exception:
-            pass
-    key = os.environ.get("ANTHROPIC_API_KEY", "")
-    if not key:
-        sys.exit("❌ No Anthropic API key found")
-    return key
-
-
 def get_brave_key() -> str:
-    config_path = Path.home() / ".openclaw" / "openclaw.json"
-    if config_path.exists():
-        try:
-            cfg = json.loads(config_path.read_text())
-            key = cfg.get("tools", {}).get("web", {}).get("search", {}).get("apiKey", "")
-            if key:
-                return key
-        except Exception:
-            pass
+    key = get_str(load_openclaw(), "tools", "web", "search", "apiKey")
+    if key:
+        return key
     key = os.environ.get("BRAVE_API_KEY", "")
     if not key:
         sys.exit("❌ No Brave API key found")
     return key
 
 
-def get_telegram_token() -> str:
-    config_path = Path.home() / ".openclaw" / "openclaw.json"
-    if config_path.exists():
-        try:
-            cfg = json.loads(config_path.read_text())
-            token = cfg.get("channels", {}).get("telegram", {}).get("botToken", "")
-            if token:
-                return token
-        except Exception:
-            pass
-    sys.exit("❌ No Telegram bot token found")
-
-
 # ── Web search ────────────────────────────────────────────────────────────────
 
 def web_search(query: str, brave_key: str, count: int = 8) -> list[dict]:
     """Run a Brave web search. Returns list of {title, url, description}."""
     try:
-        resp = requests.get(
+        resp = SESSION.get(
             "https://api.search.brave.com/res/v1/web/search",
             headers={"Accept": "application/json", "X-Subscription-Token": brave_key},
             params={"q": query, "count": count, "freshness": "pd"},
@@ -112,16 +90,51 @@ def web_search(query: str, brave_key: str, count: int = 8) -> list[dict]:
         return []
 
 
+def dedupe_queries(queries: list[str], threshold: float = 0.9) -> list[str]:
+    """Drop exact and near-duplicate queries, keeping first occurrences in order.
+
+    Queries are compared by their case-folded word sets; one is dropped when it
+    matches an earlier query exactly or overlaps it by more than `threshold`
+    Jaccard similarity. Every word counts, so short tokens such as AI, Q1 or
+    IPO keep otherwise similar queries apart. Each drop is logged to stderr.
+    """
+    kept: list[str] = []
+    seen_tokens: list[frozenset[str]] = []
+    for query in (q.strip() for q in queries if q and q.strip()):
+        tokens = frozenset(query.lower().split())
+        match = next((prev for prev, prev_tokens in zip(kept, seen_tokens)
+                      if len(tokens & prev_tokens) / len(tokens | prev_tokens) > threshold),
+                     None)
+        if match is not None:
+            print(f"  ⏭️  Skipping duplicate query '{query}' (matches '{match}')", file=sys.stderr)
+            continue
+        kept.append(query)
+        seen_tokens.append(tokens)
+    return kept
+
+
+SEARCH_WORKERS = 5
+
+
 def run_searches(queries: list[str], brave_key: str, delay: float = 1.0) -> str:
-    """Run all searches and compile results into a single context string."""
+    """Run all searches and compile results into a single context string.
+
+    Queries are dispatched concurrently but started at most once per `delay`
+    seconds to stay inside Brave's per-second quota; results keep query order.
+    """
+    limiter = RateLimiter(delay)
+
+    def search(item: tuple[int, str]) -> list[dict]:
+        i, query = item
+        limiter.acquire()
+        print(f"  🔍 [{i}/{len(queries)}] {query}", file=sys.stderr)
+        return web_search(query, brave_key)
+
     all_results = []
-    for i, query in enumerate(queries):
-        print(f"  🔍 [{i+1}/{len(queries)}] {query}", file=sys.stderr)
-        results = web_search(query, brave_key)
-        for r in results:
-            all_results.append(f"• [{r['title']}]({r['url']})\n  {r['description']}")
-        if i < len(queries) - 1:
-            time.sleep(delay)
+    with ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as pool:
+        for results in pool.map(search, enumerate(queries, 1)):
+            for r in results:
+                all_results.append(f"• [{r['title']}]({r['url']})\n  {r['description']}")
 
     return "\n\n".join(all_results) if all_results else "No search results found."
 
@@ -141,7 +154,7 @@ def call_claude(prompt: str, search_context: str, api_key: str,
     full_prompt = prompt.replace("{date}", date_str)
     full_prompt += f"\n\n---\n## Search Results\n\n{search_context}"
 
-    resp = requests.post(
+    resp = SESSION.post(
         "https://api.anthropic.com/v1/messages",
         headers={
             "x-api-key": api_key,
@@ -161,6 +174,9 @@ def call_claude(prompt: str, search_context: str, api_key: str,
 
 # ── Telegram delivery ─────────────────────────────────────────────────────────
 
+HREF_RE = re.compile(r'href=["\']([^"\']*)["\']')
+
+
 def sanitize_html(text: str) -> str:
     """
     Fix malformed HTML for Telegram using a stack-based parser.
@@ -208,7 +224,7 @@ def sanitize_html(text: str) -> str:
 
             if tag_name in ALLOWED_TAGS:
                 if tag_name == "a":
-                    href_m = re.search(r'href=["\']([^"\']*)["\']', attrs_raw)
+                    href_m = HREF_RE.search(attrs_raw)
                     if href_m:
                         url = href_m.group(1)
                         result.append(f'<a href="{url}">')
@@ -230,22 +246,33 @@ def sanitize_html(text: str) -> str:
     return "".join(result)
 
 
+def split_chunks(text: str, max_len: int = 4000) -> Iterator[str]:
+    """Yield pieces of at most max_len chars, breaking on the last newline before the limit.
+
+    Works on offsets in a single pass; newlines at a break are dropped.
+    """
+    i, n = 0, len(text)
+    while i < n:
+        if n - i <= max_len:
+            yield text[i:]
+            return
+        end = text.rfind("\n", i, i + max_len)
+        if end <= i:
+            end = i + max_len
+        yield text[i:end]
+        i = end
+        while i < n and text[i] == "\n":
+            i += 1
+
+
+TELEGRAM_LIMITER = RateLimiter(0.5)
+
+
 def send_telegram(text: str, chat_id: str, thread_id: int, bot_token: str) -> bool:
     """Send message to Telegram. Splits if > 4000 chars."""
-    text = sanitize_html(text)
-    MAX_LEN = 4000
-    chunks = []
-    while len(text) > MAX_LEN:
-        split_at = text.rfind("\n", 0, MAX_LEN)
-        if split_at == -1:
-            split_at = MAX_LEN
-        chunks.append(text[:split_at])
-        text = text[split_at:].lstrip("\n")
-    if text:
-        chunks.append(text)
-
-    for chunk in chunks:
-        resp = requests.post(
+    for chunk in split_chunks(sanitize_html(text)):
+        TELEGRAM_LIMITER.acquire()
+        resp = SESSION.post(
             f"https://api.telegram.org/bot{bot_token}/sendMessage",
             json={
                 "chat_id": chat_id,
@@ -259,7 +286,6 @@ def send_telegram(text: str, chat_id: str, thread_id: int, bot_token: str) -> bo
         if not resp.ok:
             print(f"  ⚠️  Telegram error: {resp.text}")
             return False
-        time.sleep(0.5)
 
     return True
 
@@ -323,17 +349,25 @@ def archive_to_github(content: str, module_name: str, run_type: str, repo_path:
 
 # ── Main ──────────────────────────────────────────────────────────────────────
 
-def main():
-    if len(sys.argv) < 3:
-        print(__doc__)
-        sys.exit(1)
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("module", help="name of config in configs/ (e.g. stone-news)")
+    parser.add_argument("run_type", type=str.lower, choices=("daily", "weekly", "flash"))
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--data-only", action="store_true",
+                      help="print prompt + search context as JSON (no Claude, no Telegram)")
+    mode.add_argument("--send-file", metavar="FILE",
+                      help="send pre-written content from FILE instead of calling Claude")
+    return parser.parse_args()
 
-    module_name = sys.argv[1]
-    run_type    = sys.argv[2].lower()   # daily | weekly | flash
-    data_only   = "--data-only" in sys.argv
 
-    if run_type not in ("daily", "weekly", "flash"):
-        sys.exit(f"❌ Unknown run_type '{run_type}'. Use: daily | weekly | flash")
+def main():
+    args = parse_args()
+    module_name = args.module
+    run_type    = args.run_type   # daily | weekly | flash
+    data_only   = args.data_only
 
     print(f"🗞  agent-brief-mac — {module_name} / {run_type}", file=sys.stderr)
     print(f"   {datetime.now(tz=TZ).strftime('%Y-%m-%d %H:%M %Z')}\n", file=sys.stderr)
@@ -356,7 +390,7 @@ def main():
     prompt_text = prompt_raw.replace("{date}", date_str)
 
     queries_key = "searches_weekly" if run_type == "weekly" else "searches"
-    queries     = config.get(queries_key) or config.get("searches", [])
+    queries     = dedupe_queries(config.get(queries_key) or config.get("searches", []))
 
     # Run searches
     print(f"🔍 Running {len(queries)} searches...", file=sys.stderr)
@@ -377,10 +411,8 @@ def main():
         return
 
     # ── Send-file mode: agent writes content to a file, script sends it ───────
-    if "--send-file" in sys.argv:
-        idx = sys.argv.index("--send-file")
-        file_path = sys.argv[idx + 1]
-        content   = Path(file_path).read_text(encoding="utf-8").strip()
+    if args.send_file:
+        content   = Path(args.send_file).read_text(encoding="utf-8").strip()
         bot_token = get_telegram_token()
         print(f"📤 Sending to Telegram (chat={chat_id}, thread={thread_id})...", file=sys.stderr)
         ok = send_telegram(content, chat_id, thread_id, bot_token)